@@ -7,67 +7,271 @@ import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 import sqlite3
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from bs4 import BeautifulSoup, SoupStrainer
 from playwright.sync_api import sync_playwright
 import threading
+import queue
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, Future
 import time
 import json
 from datetime import datetime
 from pathlib import Path
-import shutil
 import re
 
+# Patterns used to find prices in page text: currency-marked amounts first, then any number
+_PRICE_TEXT_PATTERNS = (
+    re.compile(r'\$[\d,]+\.?\d*|USD\s*[\d,]+\.?\d*|[\d,]+\.?\d*\s*USD|Price:\s*\$?[\d,]+\.?\d*'),
+    re.compile(r'[\d,]+\.?\d*'),
+)
+# Everything except digits and the decimal point (strips symbols and thousands separators)
+_NON_NUMERIC = re.compile(r'[^\d.]')
+# Common price selectors joined so the tree is walked once
+_COMMON_SELECTOR = ",".join([
+    '.price', '#price', '.product-price', '.current-price',
+    '[data-price]', '.price-current', '.price-now',
+    '.offer-price', '.sale-price', '.final-price'
+])
+# Returns the text of every element matching the given selectors, in selector order
+_PAGE_PRICE_TEXTS_JS = """selectors => {
+    const texts = [];
+    for (const selector of selectors) {
+        try {
+            for (const element of document.querySelectorAll(selector)) {
+                if (element.innerText) texts.push(element.innerText);
+            }
+        } catch (e) {}  // skip invalid selectors
+    }
+    return texts;
+}"""
+# Recently fetched prices are reused for this many seconds
+_PRICE_CACHE_TTL = 60
+_PRICE_CACHE_SIZE = 128
+# Size of the first chunk of a page parsed before downloading the rest
+_HTML_HEAD_BYTES = 131072
+# Keeps only elements whose class looks price-related when parsing a page
+_PRICE_STRAINER = SoupStrainer(attrs={'class': re.compile('price|amount|cost', re.I)})
+
+# Frequently run statements, kept as constants so SQLite's statement cache reuses them
+_SQL_INSERT_PRODUCT = 'INSERT INTO products (name, url, target_price, selector) VALUES (?, ?, ?, ?)'
+_SQL_SELECT_PRODUCT_ROWS = '''
+    SELECT name, current_price, target_price, strftime('%Y-%m-%d %H:%M', last_checked), active
+    FROM products WHERE active = 1
+'''
+_SQL_SELECT_PRODUCTS_TO_CHECK = 'SELECT id, name, url, selector, current_price, target_price FROM products WHERE active = 1'
+_SQL_UPDATE_PRICE = 'UPDATE products SET current_price = ?, last_checked = ? WHERE id = ?'
+_SQL_INSERT_HISTORY = 'INSERT INTO price_history (product_id, price) VALUES (?, ?)'
+_SQL_DEACTIVATE_PRODUCT = 'UPDATE products SET active = 0 WHERE name = ?'
+_SQL_SELECT_HISTORY = '''
+    SELECT strftime('%Y-%m-%d %H:%M:%S', ph.timestamp),
+           ph.price,
+           ph.price - LAG(ph.price) OVER (
+               PARTITION BY ph.product_id ORDER BY ph.timestamp, ph.id
+           ) AS change
+    FROM price_history ph
+    JOIN products p ON ph.product_id = p.id
+    WHERE p.name = ?
+    ORDER BY ph.timestamp DESC, ph.id DESC
+'''
+
+# Column order of the rows written by export_data (products.* and price_history.* + product name)
+_EXPORT_PRODUCT_COLUMNS = ('id', 'name', 'url', 'target_price', 'current_price',
+                           'last_checked', 'created_at', 'selector', 'active')
+_EXPORT_HISTORY_COLUMNS = ('id', 'product_id', 'price', 'timestamp', 'name')
+
 class PriceTracker:
     def __init__(self, root):
         self.root = root
         self.root.title("Price Tracker")
         self.root.geometry("1000x700")
         
-        # Database setup
+        # Database setup: one worker thread owns the connection and runs all DB work
         self.db_path = Path("price_tracker.db")
+        self._db_queue = queue.Queue()
+        self._db_thread = threading.Thread(target=self._db_worker, daemon=True)
+        self._db_thread.start()
         self.init_database()
         
+        # HTTP session so repeated checks reuse pooled connections
+        self.session = requests.Session()
+        self.session.headers.update({
+            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+            'Accept-Language': 'en-US,en;q=0.5',
+            'Accept-Encoding': 'gzip, deflate',
+            'Connection': 'keep-alive',
+        })
+        retry = Retry(total=2, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504))
+        adapter = HTTPAdapter(pool_connections=20, pool_maxsize=20, max_retries=retry)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        
+        # Recent prices keyed by (url, selector), oldest first
+        self._price_cache = OrderedDict()
+        self._price_cache_lock = threading.Lock()
+        
+        # Shared Playwright browser, started on first use. The sync API is bound
+        # to the thread that started it, so all browser work runs on one worker.
+        self._pw = None
+        self._browser = None
+        self._playwright_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='playwright')
+        
         # Tracking variables
         self.tracking_active = False
         self.tracking_thread = None
+        self._stop_event = threading.Event()
         
         # Create GUI
         self.create_widgets()
         self.load_products()
         
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        
     def init_database(self):
         """Initialize SQLite database"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        def create_schema(conn):
+            cursor = conn.cursor()
+            
+            # Products table
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS products (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    name TEXT NOT NULL,
+                    url TEXT NOT NULL UNIQUE,
+                    target_price REAL,
+                    current_price REAL,
+                    last_checked TIMESTAMP,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    selector TEXT,
+                    active INTEGER DEFAULT 1
+                )
+            """)
+            
+            # Price history table
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS price_history (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    product_id INTEGER,
+                    price REAL,
+                    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    FOREIGN KEY (product_id) REFERENCES products (id)
+                )
+            ''')
+            
+            # Index for per-product history lookups
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_history_pid_ts
+                ON price_history (product_id, timestamp DESC)
+            ''')
         
-        # Products table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS products (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                url TEXT NOT NULL UNIQUE,
-                target_price REAL,
-                current_price REAL,
-                last_checked TIMESTAMP,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                selector TEXT,
-                active INTEGER DEFAULT 1
-            )
-        """)
-        
-        # Price history table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS price_history (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                product_id INTEGER,
-                price REAL,
-                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (product_id) REFERENCES products (id)
-            )
-        ''')
+        self.db_call(create_schema)
+    
+    def _db_worker(self):
+        """Own the SQLite connection and run queued DB jobs in order"""
+        try:
+            conn = self._connect_db()
+        except Exception as e:
+            # Fail every job rather than leaving callers blocked on their futures
+            while True:
+                job = self._db_queue.get()
+                if job is None:
+                    return
+                job[2].set_exception(e)
+        
+        while True:
+            # Drain everything already queued so pending statements share one transaction
+            jobs = [self._db_queue.get()]
+            while True:
+                try:
+                    jobs.append(self._db_queue.get_nowait())
+                except queue.Empty:
+                    break
+            
+            statements = []
+            for job in jobs:
+                if job is not None and job[0] == 'sql':
+                    statements.append(job)
+                    continue
+                
+                self._run_db_statements(conn, statements)
+                statements = []
+                if job is None:
+                    conn.close()
+                    return
+                
+                _, func, future = job
+                try:
+                    future.set_result(func(conn))
+                except Exception as e:
+                    future.set_exception(e)
+            
+            self._run_db_statements(conn, statements)
+    
+    def _connect_db(self):
+        """Open and tune the connection used by the DB worker"""
+        conn = sqlite3.connect(self.db_path, isolation_level=None, cached_statements=256)
+        
+        # Connection tuning: WAL keeps a crash-safe log with cheap commits
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('PRAGMA temp_store=MEMORY')
+        conn.execute('PRAGMA mmap_size=268435456')
+        conn.execute('PRAGMA cache_size=-20000')
+        return conn
+    
+    def _run_db_statements(self, conn, statements):
+        """Run queued statements, batching more than one into a single transaction"""
+        if len(statements) == 1:
+            _, (sql, params, many), future = statements[0]
+            try:
+                cursor = conn.executemany(sql, params) if many else conn.execute(sql, params)
+                future.set_result(cursor.fetchall())
+            except Exception as e:
+                future.set_exception(e)
+            return
+        if not statements:
+            return
+        
+        # Each statement gets a savepoint so one failure does not undo the others
+        results = []
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            for _, (sql, params, many), future in statements:
+                conn.execute('SAVEPOINT job')
+                try:
+                    cursor = conn.executemany(sql, params) if many else conn.execute(sql, params)
+                    results.append((future, cursor.fetchall()))
+                    conn.execute('RELEASE job')
+                except sqlite3.Error as e:
+                    conn.execute('ROLLBACK TO job')
+                    conn.execute('RELEASE job')
+                    future.set_exception(e)
+            conn.execute('COMMIT')
+        except Exception as e:
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+            for _, _, future in statements:
+                if not future.done():
+                    future.set_exception(e)
+            return
         
-        conn.commit()
-        conn.close()
+        for future, rows in results:
+            future.set_result(rows)
+    
+    def _db_submit(self, job_type, payload):
+        """Queue a job for the DB worker and return its future"""
+        future = Future()
+        self._db_queue.put((job_type, payload, future))
+        return future
+    
+    def db_execute(self, sql, params=(), many=False):
+        """Run one statement on the DB worker and return the fetched rows"""
+        return self._db_submit('sql', (sql, params, many)).result()
+    
+    def db_call(self, func):
+        """Run func(conn) on the DB worker and return its result"""
+        return self._db_submit('call', func).result()
     
     def create_widgets(self):
         """Create the main GUI widgets"""
@@ -143,11 +347,11 @@ class PriceTracker:
             self.product_tree.column(col, width=150)
         
         # Scrollbar for treeview
-        scrollbar = ttk.Scrollbar(list_frame, orient='vertical', command=self.product_tree.yview)
-        self.product_tree.configure(yscrollcommand=scrollbar.set)
+        self.product_scrollbar = ttk.Scrollbar(list_frame, orient='vertical', command=self.product_tree.yview)
+        self.product_tree.configure(yscrollcommand=self.product_scrollbar.set)
         
         self.product_tree.pack(side='left', fill='both', expand=True)
-        scrollbar.pack(side='right', fill='y')
+        self.product_scrollbar.pack(side='right', fill='y')
         
         # Product control buttons
         control_frame = ttk.Frame(self.product_frame)
@@ -158,6 +362,7 @@ class PriceTracker:
         ttk.Button(control_frame, text="Stop Auto Tracking", command=self.stop_tracking).pack(side='left', padx=5)
         ttk.Button(control_frame, text="Delete Selected", command=self.delete_product).pack(side='left', padx=5)
         ttk.Button(control_frame, text="Export Data", command=self.export_data).pack(side='right', padx=5)
+        ttk.Button(control_frame, text="Import Data", command=self.import_data).pack(side='right', padx=5)
     
     def create_history_tab(self):
         """Create the price history tab"""
@@ -240,14 +445,7 @@ class PriceTracker:
             return
         
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            cursor.execute('''
-                INSERT INTO products (name, url, target_price, selector)
-                VALUES (?, ?, ?, ?)
-            ''', (name, url, target_price, selector))
-            conn.commit()
-            conn.close()
+            self.db_execute(_SQL_INSERT_PRODUCT, (name, url, target_price, selector))
             
             # Clear entries
             self.name_entry.delete(0, tk.END)
@@ -288,25 +486,67 @@ class PriceTracker:
         
         threading.Thread(target=test_thread, daemon=True).start()
     
-    def get_price(self, url, selector=None):
+    def get_price(self, url, selector=None, use_playwright=True):
+        """Extract price from URL, reusing a recent result for the same URL and selector"""
+        price = self._get_cached_price(url, selector)
+        if price is None:
+            price = self._fetch_price(url, selector, use_playwright)
+            self._cache_price(url, selector, price)
+        return price
+    
+    def _get_cached_price(self, url, selector):
+        """Return the cached price if it is younger than the TTL"""
+        key = (url, selector or None)
+        with self._price_cache_lock:
+            entry = self._price_cache.get(key)
+            if entry is None:
+                return None
+            price, fetched_at = entry
+            if time.monotonic() - fetched_at > _PRICE_CACHE_TTL:
+                del self._price_cache[key]
+                return None
+            self._price_cache.move_to_end(key)
+            return price
+    
+    def _cache_price(self, url, selector, price):
+        """Remember a successfully fetched price, evicting the least recently used entry"""
+        if not price:
+            return
+        key = (url, selector or None)
+        with self._price_cache_lock:
+            self._price_cache[key] = (price, time.monotonic())
+            self._price_cache.move_to_end(key)
+            if len(self._price_cache) > _PRICE_CACHE_SIZE:
+                self._price_cache.popitem(last=False)
+    
+    def _fetch_price(self, url, selector=None, use_playwright=True):
         """Extract price from URL using multiple methods"""
         try:
             # Method 1: Try with requests + BeautifulSoup
-            headers = {
-                'User-Agent': self.user_agent_var.get(),
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-                'Accept-Language': 'en-US,en;q=0.5',
-                'Accept-Encoding': 'gzip, deflate',
-                'Connection': 'keep-alive',
-            }
-            
-            response = requests.get(url, headers=headers, timeout=10)
-            response.raise_for_status()
+            user_agent = self.user_agent_var.get()
+            if self.session.headers.get('User-Agent') != user_agent:
+                self.session.headers.update({'User-Agent': user_agent})
             
-            soup = BeautifulSoup(response.content, 'html.parser')
-            price = self.extract_price_from_soup(soup, selector)
+            with self.session.get(url, timeout=10, stream=True) as response:
+                response.raise_for_status()
+                
+                # The price is usually near the top, so try the first chunk before downloading the rest.
+                # Cut at the last tag start so the chunk does not end inside a tag; matches in
+                # elements left open at the cut are not trusted (see extract_price_from_soup).
+                head = response.raw.read(_HTML_HEAD_BYTES, decode_content=True)
+                if len(head) < _HTML_HEAD_BYTES:
+                    # The whole page fit in the first read, so parse it once
+                    price = self.parse_price_html(head, selector)
+                else:
+                    tag_start = head.rfind(b'<')
+                    price = self.parse_price_html(head[:tag_start] if tag_start > 0 else head, selector,
+                                                  search_text=False, partial=True)
+                    
+                    if not price:
+                        html = head + response.raw.read(decode_content=True)
+                        price = self.parse_price_html(html, selector)
             
-            if price:
+            if price or not use_playwright:
                 return price
             
             # Method 2: Try with Playwright for JavaScript-heavy sites
@@ -316,106 +556,116 @@ class PriceTracker:
             print(f"Error getting price: {e}")
             return None
     
-    def extract_price_from_soup(self, soup, selector=None):
+    def parse_price_html(self, html, selector=None, search_text=True, partial=False):
+        """Parse HTML bytes and extract the price (partial=True for a truncated document)"""
+        if not selector:
+            # Most pages tag the price with a price-like class, so parse just those elements first
+            soup = BeautifulSoup(html, 'lxml', parse_only=_PRICE_STRAINER)
+            if soup.contents:
+                price = self.extract_price_from_soup(soup, search_text=False, partial=partial)
+                if price:
+                    return price
+        
+        soup = BeautifulSoup(html, 'lxml')
+        return self.extract_price_from_soup(soup, selector, search_text, partial)
+    
+    def extract_price_from_soup(self, soup, selector=None, search_text=True, partial=False):
         """Extract price from BeautifulSoup object"""
-        price_patterns = [
-            r'\$[\d,]+\.?\d*',
-            r'USD\s*[\d,]+\.?\d*',
-            r'[\d,]+\.?\d*\s*USD',
-            r'Price:\s*\$?[\d,]+\.?\d*',
-            r'[\d,]+\.?\d*'
-        ]
+        # In a truncated document, an element still open at the cut may be missing part of its
+        # price, so reaching one ends the search and the caller falls back to the full page
+        unclosed = self._unclosed_elements(soup) if partial else set()
         
         # Try custom selector first
         if selector:
             elements = soup.select(selector)
             for element in elements:
+                if id(element) in unclosed:
+                    return None
                 price = self.parse_price_text(element.get_text())
                 if price:
                     return price
         
         # Try common price selectors
-        common_selectors = [
-            '.price', '#price', '.product-price', '.current-price',
-            '[data-price]', '.price-current', '.price-now',
-            '.offer-price', '.sale-price', '.final-price'
-        ]
-        
-        for sel in common_selectors:
-            elements = soup.select(sel)
-            for element in elements:
-                price = self.parse_price_text(element.get_text())
-                if price:
-                    return price
+        for element in soup.select(_COMMON_SELECTOR):
+            if id(element) in unclosed:
+                return None
+            price = self.parse_price_text(element.get_text())
+            if price:
+                return price
         
-        # Try finding price in text content
-        text = soup.get_text()
-        for pattern in price_patterns:
-            matches = re.findall(pattern, text)
-            for match in matches:
-                price = self.parse_price_text(match)
-                if price and price > 0:
-                    return price
+        if not search_text:
+            return None
+        
+        # Try finding price in text content, one text node at a time
+        for pattern in _PRICE_TEXT_PATTERNS:
+            for string in soup.strings:
+                for match in pattern.findall(string):
+                    price = self.parse_price_text(match)
+                    if price and price > 0:
+                        return price
         
         return None
     
+    def _unclosed_elements(self, soup):
+        """Return ids of the last node and its ancestors, which lxml closes at the end of input"""
+        last = soup
+        while getattr(last, 'contents', None):
+            last = last.contents[-1]
+        return {id(last)} | {id(parent) for parent in last.parents}
+    
     def get_price_with_playwright(self, url, selector=None):
         """Get price using Playwright for JavaScript-heavy sites"""
         try:
-            with sync_playwright() as p:
-                browser = p.chromium.launch(headless=True)
-                page = browser.new_page()
-                page.set_extra_http_headers({
-                    'User-Agent': self.user_agent_var.get()
-                })
-                
-                page.goto(url, wait_until='networkidle')
-                
-                if selector:
-                    try:
-                        element = page.query_selector(selector)
-                        if element:
-                            text = element.inner_text()
-                            price = self.parse_price_text(text)
-                            if price:
-                                browser.close()
-                                return price
-                    except:
-                        pass
-                
-                # Try common selectors
-                common_selectors = [
-                    '.price', '#price', '.product-price', '.current-price',
-                    '[data-price]', '.price-current', '.price-now'
-                ]
-                
-                for sel in common_selectors:
-                    try:
-                        element = page.query_selector(sel)
-                        if element:
-                            text = element.inner_text()
-                            price = self.parse_price_text(text)
-                            if price:
-                                browser.close()
-                                return price
-                    except:
-                        continue
-                
-                browser.close()
-                return None
-                
+            future = self._playwright_executor.submit(
+                self._get_price_with_playwright, url, selector, self.user_agent_var.get()
+            )
+            return future.result()
         except Exception as e:
             print(f"Playwright error: {e}")
             return None
     
+    def _get_price_with_playwright(self, url, selector, user_agent):
+        """Load the page in a fresh context on the shared browser (runs on the Playwright worker)"""
+        context = self._ensure_browser().new_context(user_agent=user_agent)
+        try:
+            page = context.new_page()
+            page.goto(url, wait_until='networkidle')
+            
+            # Collect candidate texts in one round trip: custom selector first, then common selectors
+            selectors = [selector, _COMMON_SELECTOR] if selector else [_COMMON_SELECTOR]
+            for text in page.evaluate(_PAGE_PRICE_TEXTS_JS, selectors):
+                price = self.parse_price_text(text)
+                if price:
+                    return price
+            
+            return None
+        finally:
+            context.close()
+    
+    def _ensure_browser(self):
+        """Start the shared Chromium instance if it is not running"""
+        if self._browser is None or not self._browser.is_connected():
+            if self._pw is None:
+                self._pw = sync_playwright().start()
+            self._browser = self._pw.chromium.launch(headless=True)
+        return self._browser
+    
+    def _close_browser(self):
+        """Shut down the shared browser and Playwright driver"""
+        if self._browser is not None:
+            self._browser.close()
+            self._browser = None
+        if self._pw is not None:
+            self._pw.stop()
+            self._pw = None
+    
     def parse_price_text(self, text):
         """Parse price from text string"""
         if not text:
             return None
         
         # Remove common currency symbols and clean text
-        text = re.sub(r'[^\d.,]', '', text.strip())
-        text = re.sub(r',', '', text)
+        text = _NON_NUMERIC.sub('', text.strip())
         
         try:
             # Handle different decimal formats
@@ -428,39 +678,32 @@ class PriceTracker:
     
     def load_products(self):
         """Load products into the treeview"""
-        # Clear existing items
-        for item in self.product_tree.get_children():
-            self.product_tree.delete(item)
+        rows = self.db_execute(_SQL_SELECT_PRODUCT_ROWS)
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('''
-            SELECT name, current_price, target_price, last_checked, active
-            FROM products WHERE active = 1
-        ''')
-        
-        for row in cursor.fetchall():
-            name, current_price, target_price, last_checked, active = row
-            
-            # Format prices
-            current_str = f"${current_price:.2f}" if current_price else "N/A"
-            target_str = f"${target_price:.2f}" if target_price else "N/A"
-            
-            # Format last checked
-            if last_checked:
-                last_checked_dt = datetime.fromisoformat(last_checked)
-                last_checked_str = last_checked_dt.strftime("%Y-%m-%d %H:%M")
-            else:
-                last_checked_str = "Never"
-            
-            # Status
-            status = "Active" if active else "Inactive"
-            if current_price and target_price and current_price <= target_price:
-                status = "Target Reached!"
+        # Detach the tree while repopulating so it is laid out once, not per row
+        self.product_tree.pack_forget()
+        try:
+            # Clear existing items
+            self.product_tree.delete(*self.product_tree.get_children())
             
-            self.product_tree.insert('', 'end', values=(name, current_str, target_str, last_checked_str, status))
-        
-        conn.close()
+            for row in rows:
+                name, current_price, target_price, last_checked, active = row
+                
+                # Format prices
+                current_str = f"${current_price:.2f}" if current_price else "N/A"
+                target_str = f"${target_price:.2f}" if target_price else "N/A"
+                
+                # Last checked is formatted by the query
+                last_checked_str = last_checked or "Never"
+                
+                # Status
+                status = "Active" if active else "Inactive"
+                if current_price and target_price and current_price <= target_price:
+                    status = "Target Reached!"
+                
+                self.product_tree.insert('', 'end', values=(name, current_str, target_str, last_checked_str, status))
+        finally:
+            self.product_tree.pack(side='left', fill='both', expand=True, before=self.product_scrollbar)
     
     def check_prices_manual(self):
         """Manually check prices for all products"""
@@ -478,29 +721,27 @@ class PriceTracker:
     
     def check_all_prices(self):
         """Check prices for all active products"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        products = self.db_execute(_SQL_SELECT_PRODUCTS_TO_CHECK)
+        
+        # Fetch pages concurrently; Playwright is only used as a sequential fallback
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            prices = list(executor.map(
+                lambda product: self.get_price(product[2], product[3], use_playwright=False),
+                products
+            ))
         
-        cursor.execute('SELECT id, name, url, selector, current_price, target_price FROM products WHERE active = 1')
-        products = cursor.fetchall()
+        updates = []
+        inserts = []
         
-        for product_id, name, url, selector, old_price, target_price in products:
+        for (product_id, name, url, selector, old_price, target_price), new_price in zip(products, prices):
             try:
-                new_price = self.get_price(url, selector)
+                if not new_price:
+                    new_price = self.get_price_with_playwright(url, selector)
+                    self._cache_price(url, selector, new_price)
                 
                 if new_price:
-                    # Update product
-                    cursor.execute('''
-                        UPDATE products 
-                        SET current_price = ?, last_checked = ?
-                        WHERE id = ?
-                    ''', (new_price, datetime.now().isoformat(), product_id))
-                    
-                    # Add to price history
-                    cursor.execute('''
-                        INSERT INTO price_history (product_id, price)
-                        VALUES (?, ?)
-                    ''', (product_id, new_price))
+                    updates.append((new_price, datetime.now().isoformat(), product_id))
+                    inserts.append((product_id, new_price))
                     
                     # Check for notifications
                     if old_price and new_price < old_price and self.notify_price_drop.get():
@@ -512,8 +753,22 @@ class PriceTracker:
             except Exception as e:
                 print(f"Error checking price for {name}: {e}")
         
-        conn.commit()
-        conn.close()
+        if not updates:
+            return
+        
+        # Write all results in a single transaction once fetching is done
+        def save_prices(conn):
+            cursor = conn.cursor()
+            cursor.execute('BEGIN IMMEDIATE')
+            try:
+                cursor.executemany(_SQL_UPDATE_PRICE, updates)
+                cursor.executemany(_SQL_INSERT_HISTORY, inserts)
+                cursor.execute('COMMIT')
+            except Exception:
+                cursor.execute('ROLLBACK')
+                raise
+        
+        self.db_call(save_prices)
     
     def show_notification(self, message):
         """Show notification message"""
@@ -526,6 +781,7 @@ class PriceTracker:
             return
         
         self.tracking_active = True
+        self._stop_event.clear()
         self.tracking_thread = threading.Thread(target=self.tracking_loop, daemon=True)
         self.tracking_thread.start()
         
@@ -535,6 +791,7 @@ class PriceTracker:
     def stop_tracking(self):
         """Stop automatic price tracking"""
         self.tracking_active = False
+        self._stop_event.set()
         self.status_var.set("Auto tracking stopped")
         messagebox.showinfo("Success", "Automatic price tracking stopped")
     
@@ -545,16 +802,15 @@ class PriceTracker:
                 self.check_all_prices()
                 self.root.after(0, self.load_products)
                 
-                # Wait for specified interval
+                # Wait for specified interval, waking early if tracking is stopped
                 interval_minutes = int(self.interval_var.get())
-                for _ in range(interval_minutes * 60):  # Convert to seconds
-                    if not self.tracking_active:
-                        break
-                    time.sleep(1)
+                if self._stop_event.wait(interval_minutes * 60):
+                    break
                     
             except Exception as e:
                 print(f"Tracking error: {e}")
-                time.sleep(60)  # Wait 1 minute before retrying
+                if self._stop_event.wait(60):  # Wait 1 minute before retrying
+                    break
     
     def delete_product(self):
         """Delete selected product"""
@@ -567,11 +823,7 @@ class PriceTracker:
             item = self.product_tree.item(selection[0])
             product_name = item['values'][0]
             
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            cursor.execute('UPDATE products SET active = 0 WHERE name = ?', (product_name,))
-            conn.commit()
-            conn.close()
+            self.db_execute(_SQL_DEACTIVATE_PRODUCT, (product_name,))
             
             self.load_products()
             messagebox.showinfo("Success", "Product deleted successfully")
@@ -586,28 +838,13 @@ class PriceTracker:
         for item in self.history_tree.get_children():
             self.history_tree.delete(item)
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('''
-            SELECT ph.price, ph.timestamp
-            FROM price_history ph
-            JOIN products p ON ph.product_id = p.id
-            WHERE p.name = ?
-            ORDER BY ph.timestamp DESC
-        ''', (selected_product,))
-        
-        history = cursor.fetchall()
-        previous_price = None
-        
-        for price, timestamp in history:
-            # Format timestamp
-            dt = datetime.fromisoformat(timestamp)
-            date_str = dt.strftime("%Y-%m-%d %H:%M:%S")
-            
-            # Calculate change
+        # Change is computed against the previous check of the same product
+        history = self.db_execute(_SQL_SELECT_HISTORY, (selected_product,))
+        
+        for date_str, price, change in history:
+            # Format change
             change_str = ""
-            if previous_price:
-                change = price - previous_price
+            if change is not None:
                 if change > 0:
                     change_str = f"+${change:.2f}"
                 elif change < 0:
@@ -616,17 +853,10 @@ class PriceTracker:
                     change_str = "No change"
             
             self.history_tree.insert('', 'end', values=(date_str, f"${price:.2f}", change_str))
-            previous_price = price
-        
-        conn.close()
     
     def refresh_history_products(self):
         """Refresh the product list in history tab"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('SELECT name FROM products WHERE active = 1')
-        products = [row[0] for row in cursor.fetchall()]
-        conn.close()
+        products = [row[0] for row in self.db_execute('SELECT name FROM products WHERE active = 1')]
         
         self.history_product_combo['values'] = products
     
@@ -639,36 +869,128 @@ class PriceTracker:
         
         if filename:
             try:
-                conn = sqlite3.connect(self.db_path)
-                cursor = conn.cursor()
+                # Rows are streamed from the cursor straight to the file on the DB worker
+                def write_export(conn):
+                    with open(filename, 'w') as f:
+                        cursor = conn.cursor()
+                        f.write('{\n  "products": ')
+                        
+                        # Export products
+                        cursor.execute('SELECT * FROM products WHERE active = 1')
+                        self._write_json_rows(f, cursor)
+                        f.write(',\n  "history": ')
+                        
+                        # Export price history
+                        cursor.execute('''
+                            SELECT ph.*, p.name
+                            FROM price_history ph
+                            JOIN products p ON ph.product_id = p.id
+                            WHERE p.active = 1
+                        ''')
+                        self._write_json_rows(f, cursor)
+                        
+                        f.write(f',\n  "export_date": {json.dumps(datetime.now().isoformat())}\n}}\n')
                 
-                # Export products
-                cursor.execute('SELECT * FROM products WHERE active = 1')
-                products = cursor.fetchall()
-                
-                # Export price history
-                cursor.execute('''
-                    SELECT ph.*, p.name
-                    FROM price_history ph
-                    JOIN products p ON ph.product_id = p.id
-                    WHERE p.active = 1
-                ''')
-                history = cursor.fetchall()
+                self.db_call(write_export)
+                messagebox.showinfo("Success", f"Data exported to {filename}")
                 
-                data = {
-                    'products': products,
-                    'history': history,
-                    'export_date': datetime.now().isoformat()
-                }
+            except Exception as e:
+                messagebox.showerror("Error", f"Failed to export data: {str(e)}")
+    
+    def _write_json_rows(self, f, cursor):
+        """Write cursor rows to f as a JSON array, one row per line"""
+        f.write('[')
+        empty = True
+        for row in cursor:
+            f.write('\n    ' if empty else ',\n    ')
+            f.write(json.dumps(row, default=str))
+            empty = False
+        f.write(']' if empty else '\n  ]')
+    
+    def import_data(self, filename=None):
+        """Import products and price history from a JSON file written by export_data"""
+        if filename is None:
+            filename = filedialog.askopenfilename(
+                filetypes=[("JSON files", "*.json"), ("All files", "*.*")]
+            )
+        
+        if filename:
+            try:
+                with open(filename) as f:
+                    data = json.load(f)
                 
-                with open(filename, 'w') as f:
-                    json.dump(data, f, indent=2, default=str)
+                products_added, history_added = self.db_call(
+                    lambda conn: self._import_rows(conn, data['products'], data['history'])
+                )
                 
-                conn.close()
-                messagebox.showinfo("Success", f"Data exported to {filename}")
+                self.load_products()
+                self.refresh_history_products()
+                messagebox.showinfo("Success", f"Imported {products_added} products and "
+                                               f"{history_added} price history entries")
                 
             except Exception as e:
-                messagebox.showerror("Error", f"Failed to export data: {str(e)}")
+                messagebox.showerror("Error", f"Failed to import data: {str(e)}")
+    
+    def _import_rows(self, conn, products, history):
+        """Load exported rows in one transaction (runs on the DB worker)"""
+        cursor = conn.cursor()
+        
+        # One transaction for the whole load, so the import pays for a single commit
+        cursor.execute('BEGIN IMMEDIATE')
+        try:
+            # Stage the file's rows, then merge them by URL so existing ids are never reused
+            cursor.execute(f"CREATE TEMP TABLE import_products ({', '.join(_EXPORT_PRODUCT_COLUMNS)})")
+            cursor.execute(f"CREATE TEMP TABLE import_history ({', '.join(_EXPORT_HISTORY_COLUMNS)})")
+            self._insert_rows(cursor, 'import_products', _EXPORT_PRODUCT_COLUMNS, products)
+            self._insert_rows(cursor, 'import_history', _EXPORT_HISTORY_COLUMNS, history)
+            
+            cursor.execute('''
+                INSERT OR IGNORE INTO products
+                    (name, url, target_price, current_price, last_checked, created_at, selector, active)
+                SELECT name, url, target_price, current_price, last_checked, created_at, selector, active
+                FROM import_products
+            ''')
+            products_added = cursor.rowcount
+            
+            # Skip entries already present so importing the same file twice adds nothing
+            cursor.execute('''
+                INSERT INTO price_history (product_id, price, timestamp)
+                SELECT p.id, ih.price, ih.timestamp
+                FROM import_history ih
+                JOIN import_products ip ON ih.product_id = ip.id
+                JOIN products p ON p.url = ip.url
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM price_history ph
+                    WHERE ph.product_id = p.id AND ph.timestamp = ih.timestamp AND ph.price = ih.price
+                )
+            ''')
+            history_added = cursor.rowcount
+            
+            cursor.execute('DROP TABLE import_products')
+            cursor.execute('DROP TABLE import_history')
+            cursor.execute('COMMIT')
+        except Exception:
+            cursor.execute('ROLLBACK')
+            raise
+        
+        return products_added, history_added
+    
+    def _insert_rows(self, cursor, table, columns, rows):
+        """Insert rows using multi-row VALUES statements sized to SQLite's bound-parameter limit"""
+        # Builds before SQLite 3.32 allow only 999 parameters per statement
+        chunk_rows = cursor.connection.getlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER) // len(columns)
+        row_placeholder = '(' + ', '.join('?' * len(columns)) + ')'
+        for start in range(0, len(rows), chunk_rows):
+            chunk = rows[start:start + chunk_rows]
+            params = []
+            for row in chunk:
+                if len(row) != len(columns):
+                    raise ValueError(f"Expected {len(columns)} values per {table} row, got {len(row)}")
+                params.extend(row)
+            cursor.execute(
+                f"INSERT INTO {table} ({', '.join(columns)}) VALUES " + ', '.join([row_placeholder] * len(chunk)),
+                params
+            )
     
     def backup_database(self):
         """Create a backup of the database"""
@@ -676,7 +998,15 @@ class PriceTracker:
         backup_name = f"price_tracker_backup_{timestamp}.db"
         
         try:
-            shutil.copy2(self.db_path, backup_name)
+            # The online backup API copies a consistent snapshot, including WAL contents
+            def write_backup(conn):
+                backup_conn = sqlite3.connect(backup_name)
+                try:
+                    conn.backup(backup_conn, pages=1024)
+                finally:
+                    backup_conn.close()
+            
+            self.db_call(write_backup)
             messagebox.showinfo("Success", f"Database backed up to {backup_name}")
         except Exception as e:
             messagebox.showerror("Error", f"Failed to backup database: {str(e)}")
@@ -685,26 +1015,45 @@ class PriceTracker:
         """Clear price history"""
         if messagebox.askyesno("Confirm", "Are you sure you want to clear all price history?"):
             try:
-                conn = sqlite3.connect(self.db_path)
-                cursor = conn.cursor()
-                cursor.execute('DELETE FROM price_history')
-                conn.commit()
-                conn.close()
+                self.db_execute('DELETE FROM price_history')
                 
                 self.load_price_history()
                 messagebox.showinfo("Success", "Price history cleared")
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to clear history: {str(e)}")
     
+    def on_close(self):
+        """Release background resources and close the window"""
+        self.tracking_active = False
+        self._stop_event.set()
+        
+        try:
+            self._playwright_executor.submit(self._close_browser).result(timeout=10)
+        except Exception as e:
+            print(f"Playwright shutdown error: {e}")
+        self._playwright_executor.shutdown(wait=False)
+        
+        self.session.close()
+        
+        # Let the DB worker finish queued jobs and close the connection
+        self._db_queue.put(None)
+        self._db_thread.join(timeout=10)
+        
+        self.root.destroy()
+    
     def reset_database(self):
         """Reset the entire database"""
         if messagebox.askyesno("Confirm", "Are you sure you want to reset the entire database? This cannot be undone!"):
             try:
-                conn = sqlite3.connect(self.db_path)
-                cursor = conn.cursor()
-                cursor.execute('DROP TABLE IF EXISTS products')
-                cursor.execute('DROP TABLE IF EXISTS price_history')
-                conn.close()
+                def drop_tables(conn):
+                    cursor = conn.cursor()
+                    cursor.execute('DROP TABLE IF EXISTS products')
+                    cursor.execute('DROP TABLE IF EXISTS price_history')
+                
+                self.db_call(drop_tables)
+                
+                with self._price_cache_lock:
+                    self._price_cache.clear()
                 
                 self.init_database()
                 self.load_products()